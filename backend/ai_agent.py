@@ -2,102 +2,220 @@
 
 from __future__ import annotations
 
-import json
-from typing import Any, Dict, Tuple
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Set, Tuple
 
-from openai import OpenAI
+import orjson
+from cachetools import LRUCache
+from openai import AsyncOpenAI
 
 from .config import ANALYSIS_FIELDS, SYSTEM_PROMPT
 
+logger = logging.getLogger(__name__)
+
 # Default model chosen for a balance of quality and cost. Users can change this if needed.
 DEFAULT_MODEL = "gpt-4o-mini"
 
 
+_CLOSING_CLIENTS: Set[asyncio.Task] = set()
+
+
+class _ClientCache(LRUCache):
+    """An ``LRUCache`` of OpenAI clients that closes each client as it is evicted."""
+
+    def popitem(self) -> Tuple[str, AsyncOpenAI]:
+        key, client = super().popitem()
+        try:
+            task = asyncio.get_running_loop().create_task(client.close())
+        except RuntimeError:  # pragma: no cover - eviction only happens inside request handlers
+            return key, client
+        _CLOSING_CLIENTS.add(task)
+        task.add_done_callback(_CLOSING_CLIENTS.discard)
+        return key, client
+
+
+# API key -> client. Keys are held in memory only while their client stays in the cache.
+_OPENAI_CLIENTS = _ClientCache(maxsize=32)
+
+
+def _get_async_openai_client(api_key: str) -> AsyncOpenAI:
+    """Reuse one client per API key so its connection pool survives between requests."""
+
+    client = _OPENAI_CLIENTS.get(api_key)
+    if client is None:
+        client = _OPENAI_CLIENTS[api_key] = AsyncOpenAI(api_key=api_key)
+    return client
+
+
+async def close_openai_clients() -> None:
+    """Close every cached client and forget the API keys they were created with."""
+
+    clients = list(_OPENAI_CLIENTS.values())
+    _OPENAI_CLIENTS.clear()
+    await asyncio.gather(*(client.close() for client in clients), *_CLOSING_CLIENTS)
+
+
+# ANALYSIS_FIELDS never changes at runtime, so everything in the prompt except the repository
+# context is assembled once at import time.
+_SCHEMA_BLOCK = "\n".join(f"- {field}: {description}" for field, description in ANALYSIS_FIELDS.items())
+
+_PROMPT_PREFIX = (
+    "You will receive a description of a GitHub repository. "
+    "Explain the project to a complete beginner and respond with valid JSON.\n\n"
+    "Required JSON fields:\n"
+    + _SCHEMA_BLOCK
+    + "\n\n"
+    "Important rules:\n"
+    "- Keep language friendly and free of jargon.\n"
+    "- Every list should contain at least three helpful items when possible.\n"
+    "- Definitions in the glossary must be short and clear.\n\n"
+    "Repository information:\n"
+)
+
+_SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+# JSON mode makes OpenAI guarantee a syntactically valid JSON object, so the prompt no longer
+# has to plead for one and the model never spends tokens on code fences or preambles.
+_RESPONSE_FORMAT = {"type": "json_object"}
+
+
 def _build_user_prompt(context: str) -> str:
     """Create the user-facing prompt that instructs the model to return structured JSON."""
 
-    schema_lines = []
-    for field, description in ANALYSIS_FIELDS.items():
-        schema_lines.append(f"- {field}: {description}")
+    return _PROMPT_PREFIX + context
 
-    return (
-        "You will receive a description of a GitHub repository. "
-        "Explain the project to a complete beginner and respond with valid JSON.\n\n"
-        "Required JSON fields:\n"
-        + "\n".join(schema_lines)
-        + "\n\n"
-        "Important rules:\n"
-        "- Keep language friendly and free of jargon.\n"
-        "- Every list should contain at least three helpful items when possible.\n"
-        "- Definitions in the glossary must be short and clear.\n"
-        "- Return only valid JSON. Do not wrap it in code fences.\n\n"
-        "Repository information:\n"
-        f"{context}"
-    )
+
+def _build_messages(context: str) -> List[Dict[str, str]]:
+    return [_SYSTEM_MESSAGE, {"role": "user", "content": _build_user_prompt(context)}]
+
+
+def parse_response(message: str, model: str) -> Dict[str, Any]:
+    """Decode a model's JSON answer, logging the offending output when it is not valid JSON."""
+
+    try:
+        return orjson.loads(message)
+    except orjson.JSONDecodeError:
+        # JSON mode should make this impossible, so it is worth knowing when it happens.
+        logger.warning("Model %s returned invalid JSON despite JSON mode: %.200s", model, message)
+        raise
 
 
-def call_ai_agent(context: str, api_key: str, model: str = DEFAULT_MODEL) -> Tuple[Dict[str, Any], str]:
+async def call_ai_agent_async(
+    context: str, api_key: str, model: str = DEFAULT_MODEL
+) -> Tuple[Dict[str, Any], str]:
     """Send the context to the OpenAI API and parse the structured response."""
 
-    client = OpenAI(api_key=api_key)
-    completion = client.chat.completions.create(
+    client = _get_async_openai_client(api_key)
+    completion = await client.chat.completions.create(
         model=model,
         temperature=0.3,
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": _build_user_prompt(context)},
-        ],
+        response_format=_RESPONSE_FORMAT,
+        messages=_build_messages(context),
     )
 
     message = completion.choices[0].message.content or "{}"
-    data = json.loads(message)
-    return data, message
+    return parse_response(message, model), message
 
 
-def generate_rule_based_summary(context: str) -> Dict[str, Any]:
-    """Fallback summary used when an API key is missing or an AI call fails."""
+async def stream_ai_agent(context: str, api_key: str, model: str = DEFAULT_MODEL) -> AsyncIterator[str]:
+    """Yield the model's response piece by piece as OpenAI streams it back."""
+
+    client = _get_async_openai_client(api_key)
+    completion = await client.chat.completions.create(
+        model=model,
+        temperature=0.3,
+        response_format=_RESPONSE_FORMAT,
+        messages=_build_messages(context),
+        stream=True,
+    )
+    async for chunk in completion:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+def _parse_hints(context: str) -> Tuple[str, str]:
+    """Pull the description and language lines out of the structured context string."""
 
     # The context string is structured, so we can extract a few hints from it by hand.
     lines = [line.strip() for line in context.splitlines() if line.strip()]
     description = next((line.split(":", 1)[1].strip() for line in lines if line.startswith("Description:")), "")
     languages = next((line.split(":", 1)[1].strip() for line in lines if line.startswith("Languages:")), "")
+    return description, languages
+
+
+def generate_rule_based_summary(context: str) -> Dict[str, Any]:
+    """Fallback summary used when an API key is missing or an AI call fails."""
+
+    # The cached summary is immutable; callers get their own dict and lists to work with.
+    summary = {}
+    for field, value in _build_summary(*_parse_hints(context)):
+        if field == "glossary":
+            value = [{"term": term, "definition": definition} for term, definition in value]
+        elif isinstance(value, tuple):
+            value = list(value)
+        summary[field] = value
+    return summary
+
+
+@lru_cache(maxsize=256)
+def _build_summary(description: str, languages: str) -> Tuple[Tuple[str, Any], ...]:
     headline = description or "This repository does not include a description on GitHub."
 
-    summary = {
-        "project_summary": headline,
-        "how_it_helps_people": (
+    return (
+        ("project_summary", headline),
+        (
+            "how_it_helps_people",
             "This project could be useful to people who are interested in exploring the code base. "
-            "Provide an OpenAI API key to unlock a tailored explanation."
+            "Provide an OpenAI API key to unlock a tailored explanation.",
         ),
-        "main_features": [
-            "Automatic GitHub metadata gathering",
-            "Displays the README excerpt if one exists",
-            "Summarises recent commit messages for a quick update",
-        ],
-        "how_it_works": [
-            "The app downloads information directly from GitHub using their public API.",
-            "It organises the repository details, language statistics, and README summary.",
-            "Without an AI key it falls back to this simple overview to keep the experience working.",
-        ],
-        "tech_stack": [
-            "GitHub topics: " + (languages if languages else "Not specified"),
-            "Primary language reported by GitHub: " + (languages.split(",")[0] if languages else "Unknown"),
-            "Recent commits are highlighted to show ongoing work.",
-        ],
-        "getting_started": [
-            "Paste a public GitHub repository URL into the form.",
-            "Optionally provide an OpenAI API key so the AI guide can craft a custom explanation.",
-            "Review the generated summary online or export it as a PDF.",
-        ],
-        "next_steps": [
-            "Add an OpenAI API key to unlock richer, human-friendly storytelling.",
-            "Share the generated PDF with teammates who need a high-level overview.",
-            "Explore the README and commits directly on GitHub for deeper technical context.",
-        ],
-        "glossary": [
-            {"term": "Repository", "definition": "A storage space on GitHub that holds a project's files."},
-            {"term": "Commit", "definition": "A snapshot of changes developers save to the project."},
-            {"term": "README", "definition": "A document that usually explains what the project is about."},
-        ],
-    }
-    return summary
+        (
+            "main_features",
+            (
+                "Automatic GitHub metadata gathering",
+                "Displays the README excerpt if one exists",
+                "Summarises recent commit messages for a quick update",
+            ),
+        ),
+        (
+            "how_it_works",
+            (
+                "The app downloads information directly from GitHub using their public API.",
+                "It organises the repository details, language statistics, and README summary.",
+                "Without an AI key it falls back to this simple overview to keep the experience working.",
+            ),
+        ),
+        (
+            "tech_stack",
+            (
+                "GitHub topics: " + (languages if languages else "Not specified"),
+                "Primary language reported by GitHub: " + (languages.split(",")[0] if languages else "Unknown"),
+                "Recent commits are highlighted to show ongoing work.",
+            ),
+        ),
+        (
+            "getting_started",
+            (
+                "Paste a public GitHub repository URL into the form.",
+                "Optionally provide an OpenAI API key so the AI guide can craft a custom explanation.",
+                "Review the generated summary online or export it as a PDF.",
+            ),
+        ),
+        (
+            "next_steps",
+            (
+                "Add an OpenAI API key to unlock richer, human-friendly storytelling.",
+                "Share the generated PDF with teammates who need a high-level overview.",
+                "Explore the README and commits directly on GitHub for deeper technical context.",
+            ),
+        ),
+        (
+            "glossary",
+            (
+                ("Repository", "A storage space on GitHub that holds a project's files."),
+                ("Commit", "A snapshot of changes developers save to the project."),
+                ("README", "A document that usually explains what the project is about."),
+            ),
+        ),
+    )
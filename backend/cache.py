@@ -0,0 +1,60 @@
+"""In-process caches that let repeated analyses skip GitHub and OpenAI round-trips."""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from cachetools import TTLCache
+
+_MISSING = object()
+
+
+class StatsTTLCache(TTLCache):
+    """A ``TTLCache`` that also counts hits and misses for observability."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for ``key`` (or ``None``) and record the outcome."""
+
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.currsize,
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Repository snapshots change slowly, but stars and issues do move, so keep them briefly.
+SNAPSHOT_CACHE = StatsTTLCache(maxsize=512, ttl=300)
+
+# AI analyses are keyed on the commit they describe, so they can live much longer.
+ANALYSIS_CACHE = StatsTTLCache(maxsize=1024, ttl=3600)
+
+
+def analysis_cache_key(owner: str, repo: str, head_sha: Optional[str], model: str, context: str) -> Tuple[str, ...]:
+    """Build the cache key for an AI analysis.
+
+    The HEAD commit SHA invalidates entries as soon as new commits land. When GitHub did not
+    report any commits we fall back to a digest of the context sent to the model.
+    """
+
+    revision = head_sha or hashlib.sha256(context.encode("utf-8")).hexdigest()
+    return (owner.lower(), repo.lower(), revision, model)
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {"snapshots": SNAPSHOT_CACHE.stats(), "analyses": ANALYSIS_CACHE.stats()}
@@ -1,5 +1,10 @@
 """Configuration and shared constants for the Gitalyzer backend."""
 
+import os
+
+# Optional GitHub token. Authenticated requests get a far higher rate limit than anonymous ones.
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+
 SYSTEM_PROMPT = (
     "You are Gitalyzer, an AI guide that explains software projects in plain language. "
     "Assume the listener has no background in programming. Use friendly, non-technical "
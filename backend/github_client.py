@@ -2,13 +2,37 @@
 
 from __future__ import annotations
 
-import base64
-from typing import Any, Dict, List, Tuple
+import asyncio
+import re
+from typing import Any, Callable, Dict, List, MutableMapping, Optional, Tuple
 
 import httpx
+import orjson
+import pybase64
+from cachetools import LRUCache
+
+from .config import GITHUB_TOKEN
 
 GITHUB_API_BASE = "https://api.github.com"
 
+README_EXCERPT_CHARS = 4000
+
+# Only this much base64 is decoded: enough for the excerpt even if every character needs the
+# maximum four UTF-8 bytes (base64 spends four characters per three bytes).
+_README_BASE64_CHARS = -(-README_EXCERPT_CHARS * 4 // 3) * 4
+
+# Upper bound on the bodies kept for conditional requests, measured in bytes of JSON.
+ETAG_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Last ETag, parsed body and its approximate size for each URL. The ETag is replayed as
+# ``If-None-Match`` on the next request.
+ETAG_CACHE: MutableMapping[str, Tuple[str, Any, int]] = LRUCache(
+    maxsize=ETAG_CACHE_MAX_BYTES, getsizeof=lambda entry: entry[2]
+)
+
+# owner/repo after github.com, ignoring a ``.git`` suffix and any deeper path, query, or fragment.
+_REPO_URL_RE = re.compile(r"github\.com/([^/\s]+)/([^/\s?#]+?)(?:\.git)?(?:[/?#].*)?$")
+
 
 class GitHubAPIError(Exception):
     """Raised when the GitHub API returns an unexpected response."""
@@ -20,56 +44,106 @@ def extract_owner_repo(repo_url: str) -> Tuple[str, str]:
     if "github.com" not in repo_url:
         raise ValueError("The provided URL does not appear to be a GitHub repository")
 
-    cleaned = repo_url.strip().rstrip("/")
-    parts = cleaned.split("github.com/")[-1].split("/")
-    if len(parts) < 2:
+    match = _REPO_URL_RE.search(repo_url.strip())
+    if not match:
         raise ValueError("Please include both the owner and repository name in the URL")
+    return match.group(1), match.group(2)
+
+
+def create_github_client(token: Optional[str] = GITHUB_TOKEN) -> httpx.AsyncClient:
+    """Create the HTTP/2 client shared by every request for the lifetime of the app."""
+
+    headers = {"Accept": "application/vnd.github+json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return httpx.AsyncClient(http2=True, timeout=20.0, headers=headers)
+
 
-    owner, repo = parts[0], parts[1]
-    if repo.endswith(".git"):
-        repo = repo[:-4]
-    return owner, repo
+async def _get_json(
+    client: httpx.AsyncClient, url: str, trim: Callable[[Any], Any] | None = None
+) -> Tuple[httpx.Response, Any]:
+    """GET ``url`` conditionally, returning the response and its parsed body.
 
+    Replaying the last ETag lets GitHub answer with an empty ``304 Not Modified`` that does not
+    count against the rate limit; the cached body is reused in that case. ``trim`` reduces the
+    body to the parts the caller needs before it is returned and cached. The body is ``None``
+    when the request was not successful.
+    """
 
-async def fetch_repository_snapshot(owner: str, repo: str) -> Dict[str, Any]:
+    cached = ETAG_CACHE.get(url)
+    headers = {"If-None-Match": cached[0]} if cached else None
+    resp = await client.get(url, headers=headers)
+    if resp.status_code == 304 and cached:
+        return resp, cached[1]
+    if resp.status_code != 200:
+        return resp, None
+
+    data = orjson.loads(resp.content)
+    size = len(resp.content)
+    if trim is not None:
+        data = trim(data)
+        size = len(orjson.dumps(data))
+    etag = resp.headers.get("ETag")
+    if etag and size <= ETAG_CACHE_MAX_BYTES:
+        ETAG_CACHE[url] = (etag, data, size)
+    return resp, data
+
+
+def _trim_readme(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the leading base64 window that can contribute to the README excerpt."""
+
+    content = payload.get("content")
+    if payload.get("encoding", "base64") != "base64" or not isinstance(content, str):
+        return {}
+    # GitHub wraps the base64 in newlines, so slice generously before dropping them.
+    window = "".join(content[: _README_BASE64_CHARS * 2].split())[:_README_BASE64_CHARS]
+    return {"encoding": "base64", "content": window}
+
+
+def _body(result: Tuple[httpx.Response, Any] | BaseException) -> Any:
+    return None if isinstance(result, BaseException) else result[1]
+
+
+async def fetch_repository_snapshot(client: httpx.AsyncClient, owner: str, repo: str) -> Dict[str, Any]:
     """Collect useful metadata, language stats, and a README excerpt for a repository."""
 
-    async with httpx.AsyncClient(timeout=20.0, headers={"Accept": "application/vnd.github+json"}) as client:
-        repo_resp = await client.get(f"{GITHUB_API_BASE}/repos/{owner}/{repo}")
-        if repo_resp.status_code != 200:
-            raise GitHubAPIError(
-                f"Unable to retrieve repository: {repo_resp.status_code} {repo_resp.text}"
-            )
-        repo_data = repo_resp.json()
-
-        languages_resp = await client.get(f"{GITHUB_API_BASE}/repos/{owner}/{repo}/languages")
-        languages_data = languages_resp.json() if languages_resp.status_code == 200 else {}
-
-        readme_text = ""
-        readme_resp = await client.get(f"{GITHUB_API_BASE}/repos/{owner}/{repo}/readme")
-        if readme_resp.status_code == 200:
-            readme_payload = readme_resp.json()
-            encoding = readme_payload.get("encoding", "base64")
-            if encoding == "base64" and "content" in readme_payload:
-                raw_bytes = base64.b64decode(readme_payload["content"].encode())
-                readme_text = raw_bytes.decode("utf-8", errors="ignore")
-        else:
-            readme_text = ""
-
-        commits_resp = await client.get(
-            f"{GITHUB_API_BASE}/repos/{owner}/{repo}/commits",
-            params={"per_page": 5},
+    base = f"{GITHUB_API_BASE}/repos/{owner}/{repo}"
+    # The four endpoints are independent, so fetch them concurrently over one connection.
+    repo_result, languages_result, readme_result, commits_result = await asyncio.gather(
+        _get_json(client, base),
+        _get_json(client, f"{base}/languages"),
+        _get_json(client, f"{base}/readme", trim=_trim_readme),
+        _get_json(client, f"{base}/commits?per_page=5"),
+        return_exceptions=True,
+    )
+
+    if isinstance(repo_result, BaseException):
+        raise GitHubAPIError(f"Unable to reach GitHub: {repo_result}") from repo_result
+    repo_resp, repo_data = repo_result
+    if repo_data is None:
+        raise GitHubAPIError(
+            f"Unable to retrieve repository: {repo_resp.status_code} {repo_resp.text}"
+        )
+
+    # The remaining calls are nice-to-have; any failure simply leaves that part empty.
+    languages_data: Dict[str, int] = _body(languages_result) or {}
+
+    readme_text = ""
+    readme_payload = _body(readme_result)
+    if readme_payload:
+        raw_bytes = pybase64.b64decode(readme_payload["content"].encode(), validate=False)
+        readme_text = raw_bytes.decode("utf-8", errors="ignore")
+
+    commits: List[Dict[str, Any]] = []
+    for item in _body(commits_result) or []:
+        commit = item.get("commit", {})
+        commits.append(
+            {
+                "sha": item.get("sha"),
+                "message": commit.get("message", ""),
+                "date": (commit.get("author") or {}).get("date"),
+            }
         )
-        commits: List[Dict[str, Any]] = []
-        if commits_resp.status_code == 200:
-            for item in commits_resp.json():
-                commit = item.get("commit", {})
-                commits.append(
-                    {
-                        "message": commit.get("message", ""),
-                        "date": (commit.get("author") or {}).get("date"),
-                    }
-                )
 
     topics = repo_data.get("topics", [])
 
@@ -88,5 +162,7 @@ async def fetch_repository_snapshot(owner: str, repo: str) -> Dict[str, Any]:
         "topics": topics,
         "languages": languages_data,
         "recent_commits": commits,
-        "readme_excerpt": readme_text[:4000],
+        # The commits endpoint lists the default branch newest first, so this is its HEAD.
+        "head_sha": commits[0]["sha"] if commits else None,
+        "readme_excerpt": readme_text[:README_EXCERPT_CHARS],
     }
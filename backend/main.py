@@ -3,19 +3,43 @@
 from __future__ import annotations
 
 import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterator, Optional, Tuple
 
-from fastapi import APIRouter, FastAPI, HTTPException
+import fastjsonschema
+import orjson
+from fastapi import APIRouter, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
-from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, Field
-
-from .ai_agent import call_ai_agent, generate_rule_based_summary
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+from .ai_agent import (
+    DEFAULT_MODEL,
+    call_ai_agent_async,
+    close_openai_clients,
+    generate_rule_based_summary,
+    parse_response,
+    stream_ai_agent,
+)
+from .cache import ANALYSIS_CACHE, SNAPSHOT_CACHE, analysis_cache_key, cache_stats
 from .config import ANALYSIS_FIELDS
-from .github_client import GitHubAPIError, extract_owner_repo, fetch_repository_snapshot
-from .pdf_generator import build_pdf
+from .github_client import (
+    GitHubAPIError,
+    create_github_client,
+    extract_owner_repo,
+    fetch_repository_snapshot,
+)
+from .pdf_generator import build_pdf_file
+from .static_files import PrecompressedStaticFiles
 
 
 class GlossaryItem(BaseModel):
@@ -34,6 +58,43 @@ class RepositoryAnalysis(BaseModel):
     glossary: list[GlossaryItem] = Field(default_factory=list)
 
 
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+# JSON Schema mirroring ``RepositoryAnalysis``. It is compiled once into a specialised validator so
+# the per-request check is plain generated Python instead of a generic schema walk.
+ANALYSIS_JSON_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "project_summary": {"type": "string"},
+        "how_it_helps_people": {"type": "string"},
+        "main_features": _STRING_LIST,
+        "how_it_works": _STRING_LIST,
+        "tech_stack": _STRING_LIST,
+        "getting_started": _STRING_LIST,
+        "next_steps": _STRING_LIST,
+        "glossary": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"term": {"type": "string"}, "definition": {"type": "string"}},
+                "required": ["term", "definition"],
+            },
+        },
+    },
+    "required": ["project_summary", "how_it_helps_people"],
+}
+
+_validate_analysis = fastjsonschema.compile(ANALYSIS_JSON_SCHEMA)
+
+
+def _parse_analysis(result: Dict[str, Any]) -> RepositoryAnalysis:
+    """Check raw analysis data with the compiled schema, then build the model without re-validating."""
+
+    _validate_analysis(result)
+    glossary = [GlossaryItem.model_construct(**entry) for entry in result.get("glossary", [])]
+    return RepositoryAnalysis.model_construct(**{**result, "glossary": glossary})
+
+
 class RepositoryInfo(BaseModel):
     name: Optional[str]
     full_name: Optional[str]
@@ -49,9 +110,14 @@ class RepositoryInfo(BaseModel):
     topics: list[str] = Field(default_factory=list)
     languages: Dict[str, int] = Field(default_factory=dict)
     recent_commits: list[Dict[str, Optional[str]]] = Field(default_factory=list)
+    head_sha: Optional[str] = None
     readme_excerpt: Optional[str]
 
 
+# Built once so validating each GitHub snapshot goes straight to the compiled core validator.
+_REPO_INFO_ADAPTER = TypeAdapter(RepositoryInfo)
+
+
 class AnalyzeRequest(BaseModel):
     repo_url: str
     api_key: Optional[str] = Field(
@@ -69,6 +135,27 @@ class AnalyzeResponse(BaseModel):
     analysis: RepositoryAnalysis
     used_ai: bool
     raw_response: Optional[str]
+    # True when the analysis came from the shared cache rather than a call made with this key.
+    cached: bool = False
+
+
+# Every model is a billed OpenAI call that keeps running after the response is sent.
+MAX_CONCURRENT_MODELS = 4
+
+
+class AnalyzeMultiRequest(AnalyzeRequest):
+    models: list[str] = Field(
+        default_factory=lambda: [DEFAULT_MODEL],
+        max_length=MAX_CONCURRENT_MODELS,
+        description=(
+            "OpenAI models to query concurrently. The first successful answer wins. "
+            "Defaults to `model` when only that is given."
+        ),
+    )
+
+
+class AnalyzeMultiResponse(AnalyzeResponse):
+    model: Optional[str] = None
 
 
 class PdfRequest(BaseModel):
@@ -76,7 +163,56 @@ class PdfRequest(BaseModel):
     analysis: RepositoryAnalysis
 
 
-app = FastAPI(title="Gitalyzer", version="1.0.0")
+class _EventStreamAwareGZipResponder(GZipResponder):
+    async def send_with_gzip(self, message: Message) -> None:
+        await super().send_with_gzip(message)
+        if message["type"] == "http.response.start":
+            # gzip buffers small writes, which would hold back individual SSE frames. Marking the
+            # response as already encoded makes the responder pass its body through untouched.
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            if content_type.startswith("text/event-stream"):
+                self.content_encoding_set = True
+
+
+class _GZipExceptEventStreams(GZipMiddleware):
+    """Gzip responses, except server-sent events that must reach the browser as they are sent."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("accept-encoding", ""):
+            responder = _EventStreamAwareGZipResponder(
+                self.app, self.minimum_size, compresslevel=self.compresslevel
+            )
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # One pooled GitHub client for the whole process avoids a TCP/TLS handshake per request.
+    app.state.http = create_github_client()
+    # PDF rendering is CPU-bound pure Python, so it runs in worker processes to sidestep the GIL.
+    # Workers are spawned rather than forked because the event loop process already runs threads.
+    # The pool is per uvicorn worker, so `--workers N` starts up to N x CPU-count renderers.
+    app.state.pdf_pool = ProcessPoolExecutor(
+        max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn")
+    )
+    try:
+        yield
+    finally:
+        await app.state.http.aclose()
+        await close_openai_clients()
+        # Joining the worker processes blocks, so keep it off the event loop.
+        await asyncio.to_thread(app.state.pdf_pool.shutdown, cancel_futures=True)
+
+
+app = FastAPI(
+    title="Gitalyzer",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+app.add_middleware(_GZipExceptEventStreams, minimum_size=1024)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -90,80 +226,313 @@ api_router = APIRouter(prefix="/api")
 
 def _build_context(repo: RepositoryInfo) -> str:
     languages_line = ", ".join(f"{name} ({score})" for name, score in repo.languages.items())
-    commits_lines = "\n".join(
-        f"  - {item.get('message', '').strip()} ({item.get('date', 'unknown date')})"
-        for item in repo.recent_commits
-    )
 
-    return (
-        f"Repository: {repo.full_name or repo.name}\n"
-        f"Description: {repo.description or 'No description provided.'}\n"
-        f"Primary language: {repo.language or 'Unknown'}\n"
-        f"Languages: {languages_line or 'Not reported'}\n"
-        f"Stars: {repo.stars}, Forks: {repo.forks}, Open issues: {repo.open_issues}\n"
-        f"Topics: {', '.join(repo.topics) if repo.topics else 'None'}\n"
-        f"Default branch: {repo.default_branch or 'main'}\n"
-        "Recent commits:\n"
-        f"{commits_lines if commits_lines else '  - No recent commits retrieved.'}\n"
-        "README excerpt:\n"
-        f"{repo.readme_excerpt or 'No README available.'}"
-    )
+    parts: list[str] = [
+        f"Repository: {repo.full_name or repo.name}",
+        f"Description: {repo.description or 'No description provided.'}",
+        f"Primary language: {repo.language or 'Unknown'}",
+        f"Languages: {languages_line or 'Not reported'}",
+        f"Stars: {repo.stars}, Forks: {repo.forks}, Open issues: {repo.open_issues}",
+        f"Topics: {', '.join(repo.topics) if repo.topics else 'None'}",
+        f"Default branch: {repo.default_branch or 'main'}",
+        "Recent commits:",
+    ]
+    if repo.recent_commits:
+        parts.extend(
+            f"  - {(item.get('message') or '').strip()} ({item.get('date') or 'unknown date'})"
+            for item in repo.recent_commits
+        )
+    else:
+        parts.append("  - No recent commits retrieved.")
+    parts.append("README excerpt:")
+    parts.append(repo.readme_excerpt or "No README available.")
+    return "\n".join(parts)
 
 
-@api_router.post("/analyze", response_model=AnalyzeResponse)
-async def analyze_repository(payload: AnalyzeRequest) -> JSONResponse:
+async def _load_repository(payload: AnalyzeRequest, request: Request) -> Tuple[str, str, RepositoryInfo, str]:
+    """Resolve the requested repository into its snapshot and the context sent to the model."""
+
     try:
         owner, repo = extract_owner_repo(payload.repo_url)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    try:
-        snapshot = await fetch_repository_snapshot(owner, repo)
-    except GitHubAPIError as exc:
-        raise HTTPException(status_code=502, detail=str(exc)) from exc
+    snapshot_key = (owner.lower(), repo.lower())
+    snapshot = SNAPSHOT_CACHE.lookup(snapshot_key)
+    if snapshot is None:
+        try:
+            snapshot = await fetch_repository_snapshot(request.app.state.http, owner, repo)
+        except GitHubAPIError as exc:
+            raise HTTPException(status_code=502, detail=str(exc)) from exc
+        SNAPSHOT_CACHE[snapshot_key] = snapshot
+
+    repo_info = _REPO_INFO_ADAPTER.validate_python(snapshot)
+    return owner, repo, repo_info, _build_context(repo_info)
+
 
-    repo_info = RepositoryInfo.model_validate(snapshot)
-    context = _build_context(repo_info)
+def _sse_event(data: str, event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {data}\n\n"
+
+
+@api_router.post("/analyze", response_model=AnalyzeResponse)
+async def analyze_repository(payload: AnalyzeRequest, request: Request) -> Response:
+    owner, repo, repo_info, context = await _load_repository(payload, request)
 
     used_ai = False
+    from_cache = False
     raw_response: Optional[str] = None
+    cache_key = None
 
     if payload.api_key:
+        model = payload.model or DEFAULT_MODEL
+        cache_key = analysis_cache_key(owner, repo, repo_info.head_sha, model, context)
+        cached = ANALYSIS_CACHE.lookup(cache_key)
         try:
-            model = payload.model or "gpt-4o-mini"
-            result, raw_response = await asyncio.to_thread(
-                call_ai_agent, context, payload.api_key, model
-            )
+            if cached is not None:
+                result, raw_response = cached
+                from_cache = True
+                cache_key = None
+            else:
+                result, raw_response = await call_ai_agent_async(context, payload.api_key, model)
             used_ai = True
         except Exception as exc:  # pragma: no cover - relies on live API behaviour
             # Fall back to a rule-based summary but keep the error message to help debugging.
             result = generate_rule_based_summary(context)
             raw_response = f"AI call failed: {exc}"
             used_ai = False
+            cache_key = None
     else:
         result = generate_rule_based_summary(context)
 
     try:
-        analysis = RepositoryAnalysis.model_validate(result)
+        analysis = _parse_analysis(result)
     except Exception as exc:  # pragma: no cover - ensures we never crash on malformed AI output
         raise HTTPException(status_code=500, detail=f"Failed to parse analysis: {exc}") from exc
 
-    return JSONResponse(
+    # Only answers that passed validation are cached, so a malformed one is retried next time.
+    if cache_key is not None:
+        ANALYSIS_CACHE[cache_key] = (result, raw_response)
+
+    # Serialise in a single pydantic-core pass rather than model_dump() followed by a JSON encoder.
+    return Response(
         AnalyzeResponse(
             repository=repo_info,
             analysis=analysis,
             used_ai=used_ai,
             raw_response=raw_response,
-        ).model_dump()
+            cached=from_cache,
+        ).model_dump_json(),
+        media_type="application/json",
     )
 
 
+@api_router.post("/analyze-stream")
+async def analyze_repository_stream(payload: AnalyzeRequest, request: Request) -> StreamingResponse:
+    """Server-sent events version of ``/analyze`` that forwards the model's output as it arrives.
+
+    Each ``data`` frame carries a ``{"delta": "..."}`` chunk of raw model text. A final
+    ``done`` event carries the same payload ``/analyze`` returns, or an ``error`` event is sent
+    if the finished text cannot be parsed into an analysis.
+    """
+
+    owner, repo, repo_info, context = await _load_repository(payload, request)
+
+    async def events() -> AsyncIterator[str]:
+        used_ai = False
+        from_cache = False
+        raw_response: Optional[str] = None
+        cache_key = None
+
+        if payload.api_key:
+            model = payload.model or DEFAULT_MODEL
+            cache_key = analysis_cache_key(owner, repo, repo_info.head_sha, model, context)
+            cached = ANALYSIS_CACHE.lookup(cache_key)
+            try:
+                if cached is not None:
+                    result, raw_response = cached
+                    from_cache = True
+                    cache_key = None
+                else:
+                    chunks = []
+                    async for delta in stream_ai_agent(context, payload.api_key, model):
+                        chunks.append(delta)
+                        yield _sse_event(orjson.dumps({"delta": delta}).decode())
+                    raw_response = "".join(chunks) or "{}"
+                    result = parse_response(raw_response, model)
+                used_ai = True
+            except Exception as exc:  # pragma: no cover - relies on live API behaviour
+                result = generate_rule_based_summary(context)
+                raw_response = f"AI call failed: {exc}"
+                cache_key = None
+        else:
+            result = generate_rule_based_summary(context)
+
+        try:
+            analysis = _parse_analysis(result)
+        except Exception as exc:  # pragma: no cover - ensures we never crash on malformed AI output
+            detail = orjson.dumps({"detail": f"Failed to parse analysis: {exc}"}).decode()
+            yield _sse_event(detail, event="error")
+            return
+
+        if cache_key is not None:
+            ANALYSIS_CACHE[cache_key] = (result, raw_response)
+
+        response = AnalyzeResponse(
+            repository=repo_info,
+            analysis=analysis,
+            used_ai=used_ai,
+            raw_response=raw_response,
+            cached=from_cache,
+        )
+        yield _sse_event(response.model_dump_json(), event="done")
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# Strong references to model calls still running after /analyze-multi has answered.
+_BACKGROUND_TASKS: set[asyncio.Task] = set()
+
+
+def _forget_task(task: asyncio.Task) -> None:
+    _BACKGROUND_TASKS.discard(task)
+    if not task.cancelled():
+        task.exception()  # Mark failures of calls nobody awaited as retrieved.
+
+
+async def _analyze_with_model(
+    context: str, api_key: str, model: str, cache_key: Tuple[str, ...]
+) -> Tuple[str, RepositoryAnalysis, str]:
+    result, raw_response = await call_ai_agent_async(context, api_key, model)
+    # Raises on a malformed answer, so it counts as a failed model rather than a winner.
+    analysis = _parse_analysis(result)
+    ANALYSIS_CACHE[cache_key] = (result, raw_response)
+    return model, analysis, raw_response
+
+
+@api_router.post("/analyze-multi", response_model=AnalyzeMultiResponse)
+async def analyze_repository_multi(payload: AnalyzeMultiRequest, request: Request) -> Response:
+    """Ask several models at once and answer with whichever succeeds first.
+
+    Slower models keep running in the background so their answers land in the analysis cache.
+    """
+
+    owner, repo, repo_info, context = await _load_repository(payload, request)
+    requested = payload.models
+    if "models" not in payload.model_fields_set and payload.model:
+        requested = [payload.model]
+    models = list(dict.fromkeys(requested)) or [DEFAULT_MODEL]
+
+    used_ai = False
+    from_cache = False
+    chosen_model: Optional[str] = None
+    raw_response: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    analysis: Optional[RepositoryAnalysis] = None
+
+    if payload.api_key:
+        keys = {
+            model: analysis_cache_key(owner, repo, repo_info.head_sha, model, context)
+            for model in models
+        }
+        for model in models:
+            cached = ANALYSIS_CACHE.lookup(keys[model])
+            if cached is not None:
+                chosen_model = model
+                result, raw_response = cached
+                used_ai = True
+                from_cache = True
+                break
+        else:
+            tasks = [
+                asyncio.create_task(_analyze_with_model(context, payload.api_key, model, keys[model]))
+                for model in models
+            ]
+            for task in tasks:
+                _BACKGROUND_TASKS.add(task)
+                task.add_done_callback(_forget_task)
+
+            errors = []
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    chosen_model, analysis, raw_response = await next_done
+                except Exception as exc:  # pragma: no cover - relies on live API behaviour
+                    errors.append(str(exc))
+                    continue
+                used_ai = True
+                break
+            else:  # pragma: no cover - relies on live API behaviour
+                raw_response = f"AI call failed: {'; '.join(errors)}"
+
+    if analysis is None:
+        if result is None:
+            result = generate_rule_based_summary(context)
+        try:
+            analysis = _parse_analysis(result)
+        except Exception as exc:  # pragma: no cover - ensures we never crash on malformed AI output
+            raise HTTPException(status_code=500, detail=f"Failed to parse analysis: {exc}") from exc
+
+    return Response(
+        AnalyzeMultiResponse(
+            repository=repo_info,
+            analysis=analysis,
+            used_ai=used_ai,
+            raw_response=raw_response,
+            cached=from_cache,
+            model=chosen_model,
+        ).model_dump_json(),
+        media_type="application/json",
+    )
+
+
+PDF_CHUNK_SIZE = 64 * 1024
+
+
+def _iter_file(file: BinaryIO) -> Iterator[bytes]:
+    while chunk := file.read(PDF_CHUNK_SIZE):
+        yield chunk
+
+
+def _discard_pdf_file(future: Future) -> None:
+    """Delete the file a worker finished writing after its request was abandoned."""
+
+    if not future.cancelled() and future.exception() is None:
+        os.unlink(future.result())
+
+
 @api_router.post("/generate-pdf")
-async def generate_pdf(payload: PdfRequest) -> StreamingResponse:
-    pdf_bytes = await asyncio.to_thread(build_pdf, payload.repo_name, payload.analysis.model_dump())
+async def generate_pdf(payload: PdfRequest, request: Request) -> StreamingResponse:
+    future = request.app.state.pdf_pool.submit(
+        build_pdf_file, payload.repo_name, payload.analysis.model_dump()
+    )
+    try:
+        path = await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        # A worker that already started keeps running, so clean up its file once it is done.
+        future.add_done_callback(_discard_pdf_file)
+        raise
+
+    # The open handle keeps the data readable after the name is gone, so nothing is left behind.
+    try:
+        pdf_file = open(path, "rb")
+    finally:
+        os.unlink(path)
+
     filename = f"{payload.repo_name or 'repository'}-gitalyzer.pdf"
     headers = {"Content-Disposition": f"attachment; filename={filename}"}
-    return StreamingResponse(iter([pdf_bytes]), media_type="application/pdf", headers=headers)
+    return StreamingResponse(
+        _iter_file(pdf_file),
+        media_type="application/pdf",
+        headers=headers,
+        background=BackgroundTask(pdf_file.close),
+    )
+
+
+@api_router.get("/cache-stats")
+async def cache_statistics() -> Dict[str, Dict[str, object]]:
+    """Report hit rates and sizes of the snapshot and analysis caches."""
+
+    return cache_stats()
 
 
 @api_router.get("/analysis-schema")
@@ -179,7 +548,7 @@ app.include_router(api_router)
 # Serve the frontend if it exists so the project works out of the box.
 FRONTEND_DIR = Path(__file__).resolve().parent.parent / "frontend"
 if FRONTEND_DIR.exists():  # pragma: no cover - filesystem dependent
-    app.mount("/", StaticFiles(directory=FRONTEND_DIR, html=True), name="frontend")
+    app.mount("/", PrecompressedStaticFiles(directory=FRONTEND_DIR, html=True), name="frontend")
 
 
 __all__ = ["app", "ANALYSIS_FIELDS"]
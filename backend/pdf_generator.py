@@ -2,95 +2,136 @@
 
 from __future__ import annotations
 
-import io
-from typing import Dict, Iterable, List
-
-from fpdf import FPDF
-
-
-class AnalysisPDF(FPDF):
-    """Customised PDF layout for the generated explanations."""
-
-    def header(self) -> None:  # pragma: no cover - drawing code
-        self.set_font("Helvetica", "B", 16)
-        self.set_text_color(40, 40, 40)
-        self.cell(0, 10, "Gitalyzer Report", ln=True, align="C")
-        self.ln(4)
-
-    def footer(self) -> None:  # pragma: no cover - drawing code
-        self.set_y(-15)
-        self.set_font("Helvetica", size=8)
-        self.set_text_color(120, 120, 120)
-        self.cell(0, 10, f"Page {self.page_no()}", align="C")
-
-
-def _write_section(pdf: AnalysisPDF, title: str, body: str | None = None) -> None:
-    pdf.set_font("Helvetica", "B", 13)
-    pdf.set_text_color(40, 40, 40)
-    pdf.multi_cell(0, 8, title)
-    pdf.ln(1)
+import os
+import tempfile
+from typing import Any, BinaryIO, Dict, Iterable, List
+from xml.sax.saxutils import escape
+
+from reportlab.lib.colors import Color
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import Flowable, ListFlowable, ListItem, Paragraph, SimpleDocTemplate, Spacer
+
+_DARK = Color(40 / 255, 40 / 255, 40 / 255)
+_BODY = Color(10 / 255, 10 / 255, 10 / 255)
+_MUTED = Color(120 / 255, 120 / 255, 120 / 255)
+
+# Every style is built once at import so each document only lays out its own content.
+_TITLE_STYLE = ParagraphStyle(
+    "GitalyzerTitle", fontName="Helvetica-Bold", fontSize=18, leading=22, spaceAfter=4 * mm
+)
+_SECTION_STYLE = ParagraphStyle(
+    "GitalyzerSection",
+    fontName="Helvetica-Bold",
+    fontSize=13,
+    leading=16,
+    textColor=_DARK,
+    spaceAfter=1 * mm,
+)
+_BODY_STYLE = ParagraphStyle("GitalyzerBody", fontName="Helvetica", fontSize=11, leading=15, textColor=_BODY)
+_TERM_STYLE = ParagraphStyle("GitalyzerTerm", parent=_BODY_STYLE, fontName="Helvetica-Bold")
+
+# (analysis key, heading, rendered as a bullet list) for every section before the glossary.
+_PDF_SECTIONS = (
+    ("project_summary", "Project Summary", False),
+    ("how_it_helps_people", "How it helps people", False),
+    ("main_features", "Main features", True),
+    ("how_it_works", "How it works", True),
+    ("tech_stack", "Tech explained simply", True),
+    ("getting_started", "Getting started", True),
+    ("next_steps", "Next steps", True),
+)
+
+
+def _draw_page_chrome(canvas: Canvas, doc: SimpleDocTemplate) -> None:  # pragma: no cover - drawing code
+    width, height = doc.pagesize
+    canvas.saveState()
+    canvas.setFont("Helvetica-Bold", 16)
+    canvas.setFillColor(_DARK)
+    canvas.drawCentredString(width / 2, height - 15 * mm, "Gitalyzer Report")
+    canvas.setFont("Helvetica", 8)
+    canvas.setFillColor(_MUTED)
+    canvas.drawCentredString(width / 2, 8 * mm, f"Page {doc.page}")
+    canvas.restoreState()
+
+
+def _text(value: str) -> str:
+    """Escape model output for reportlab's mini-markup and keep its line breaks."""
+
+    return escape(value).replace("\n", "<br/>")
+
+
+def _write_section(story: List[Flowable], title: str, body: str | None = None) -> None:
+    story.append(Paragraph(_text(title), _SECTION_STYLE))
     if body:
-        pdf.set_font("Helvetica", size=11)
-        pdf.set_text_color(10, 10, 10)
-        pdf.multi_cell(0, 6, body)
-        pdf.ln(2)
-
-
-def _write_list(pdf: AnalysisPDF, items: Iterable[str]) -> None:
-    pdf.set_font("Helvetica", size=11)
-    pdf.set_text_color(10, 10, 10)
-    for item in items:
-        pdf.multi_cell(0, 6, f"• {item}")
-    pdf.ln(2)
-
-
-def build_pdf(repo_name: str, analysis: Dict[str, any]) -> bytes:
-    pdf = AnalysisPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_page()
-
-    pdf.set_font("Helvetica", "B", 18)
-    pdf.cell(0, 12, repo_name or "Repository Report", ln=True)
-    pdf.ln(4)
-
-    summary = analysis.get("project_summary")
-    if summary:
-        _write_section(pdf, "Project Summary", summary)
+        story.append(Paragraph(_text(body), _BODY_STYLE))
+        story.append(Spacer(0, 2 * mm))
 
-    _write_section(pdf, "How it helps people", analysis.get("how_it_helps_people"))
 
-    if analysis.get("main_features"):
-        _write_section(pdf, "Main features")
-        _write_list(pdf, analysis["main_features"])
+def _write_list(story: List[Flowable], items: Iterable[str]) -> None:
+    story.append(
+        ListFlowable(
+            [ListItem(Paragraph(_text(item), _BODY_STYLE)) for item in items],
+            bulletType="bullet",
+            start="•",
+            leftIndent=5 * mm,
+        )
+    )
+    story.append(Spacer(0, 2 * mm))
 
-    if analysis.get("how_it_works"):
-        _write_section(pdf, "How it works")
-        _write_list(pdf, analysis["how_it_works"])
 
-    if analysis.get("tech_stack"):
-        _write_section(pdf, "Tech explained simply")
-        _write_list(pdf, analysis["tech_stack"])
+def build_pdf(repo_name: str, analysis: Dict[str, Any], output: BinaryIO) -> None:
+    """Render the analysis as a PDF written to ``output``."""
 
-    if analysis.get("getting_started"):
-        _write_section(pdf, "Getting started")
-        _write_list(pdf, analysis["getting_started"])
+    story: List[Flowable] = [Paragraph(_text(repo_name or "Repository Report"), _TITLE_STYLE)]
 
-    if analysis.get("next_steps"):
-        _write_section(pdf, "Next steps")
-        _write_list(pdf, analysis["next_steps"])
+    for key, title, is_list in _PDF_SECTIONS:
+        value = analysis.get(key)
+        if not value:
+            continue
+        if is_list:
+            _write_section(story, title)
+            _write_list(story, value)
+        else:
+            _write_section(story, title, value)
 
     glossary: List[Dict[str, str]] = analysis.get("glossary", [])
     if glossary:
-        _write_section(pdf, "Glossary")
+        _write_section(story, "Glossary")
         for entry in glossary:
             term = entry.get("term")
             definition = entry.get("definition")
             if term and definition:
-                pdf.set_font("Helvetica", "B", 11)
-                pdf.multi_cell(0, 6, term)
-                pdf.set_font("Helvetica", size=11)
-                pdf.multi_cell(0, 6, definition)
-                pdf.ln(1)
-
-    pdf_bytes = pdf.output(dest="S").encode("latin-1")
-    return pdf_bytes
+                story.append(Paragraph(_text(term), _TERM_STYLE))
+                story.append(Paragraph(_text(definition), _BODY_STYLE))
+                story.append(Spacer(0, 1 * mm))
+
+    doc = SimpleDocTemplate(
+        output,
+        pagesize=A4,
+        leftMargin=10 * mm,
+        rightMargin=10 * mm,
+        topMargin=25 * mm,
+        bottomMargin=15 * mm,
+        title=f"Gitalyzer Report - {repo_name}" if repo_name else "Gitalyzer Report",
+    )
+    doc.build(story, onFirstPage=_draw_page_chrome, onLaterPages=_draw_page_chrome)
+
+
+def build_pdf_file(repo_name: str, analysis: Dict[str, Any]) -> str:
+    """Render the analysis into a new temporary file and return its path.
+
+    Open files cannot cross process boundaries, so this is the entry point used by worker
+    processes. The caller is responsible for deleting the file.
+    """
+
+    output = tempfile.NamedTemporaryFile(prefix="gitalyzer-", suffix=".pdf", delete=False)
+    try:
+        with output:
+            build_pdf(repo_name, analysis, output)
+    except BaseException:
+        os.unlink(output.name)
+        raise
+    return output.name
@@ -0,0 +1,115 @@
+"""Static file serving with pre-compressed copies of the frontend's text assets."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import os
+from pathlib import Path
+from typing import Dict, Set, Tuple
+
+import brotli
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+COMPRESSIBLE_SUFFIXES = {".html", ".js", ".css"}
+
+# Preferred encoding first.
+_ENCODINGS = ("br", "gzip")
+
+
+def _compress(data: bytes) -> Dict[str, bytes]:
+    return {"br": brotli.compress(data), "gzip": gzip.compress(data, mtime=0)}
+
+
+def _accepted_encodings(header: str) -> Set[str]:
+    """Return the codings an ``Accept-Encoding`` header allows, honouring ``q=0`` refusals."""
+
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """``StaticFiles`` that answers with a brotli or gzip copy when the client accepts one.
+
+    Assets are compressed once at startup and kept in memory, so requests never pay for
+    compression and the frontend directory is never written to. An asset edited while the
+    server runs is recompressed in a worker thread; until that finishes it is served uncompressed.
+    """
+
+    def __init__(self, *, directory: str | os.PathLike[str], **kwargs) -> None:
+        super().__init__(directory=directory, **kwargs)
+        # Source path -> (source mtime, compressed bytes per encoding).
+        self._compressed: Dict[str, Tuple[float, Dict[str, bytes]]] = {}
+        self._recompressing: Set[str] = set()
+        for path in Path(directory).rglob("*"):
+            if path.suffix in COMPRESSIBLE_SUFFIXES and path.is_file():
+                self._load(str(path.resolve()), path.stat().st_mtime)
+
+    def _load(self, full_path: str, mtime: float) -> Dict[str, bytes] | None:
+        try:
+            variants = _compress(Path(full_path).read_bytes())
+        except OSError:
+            # Compression is only an optimisation; the plain file is still served.
+            return None
+        self._compressed[full_path] = (mtime, variants)
+        return variants
+
+    def _recompress(self, full_path: str, mtime: float) -> None:
+        if full_path in self._recompressing:
+            return
+        self._recompressing.add(full_path)
+        future = asyncio.get_running_loop().run_in_executor(None, self._load, full_path, mtime)
+        future.add_done_callback(lambda _: self._recompressing.discard(full_path))
+
+    def file_response(
+        self,
+        full_path: str | os.PathLike[str],
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        if Path(full_path).suffix not in COMPRESSIBLE_SUFFIXES:
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        request_headers = Headers(scope=scope)
+        accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+        encoding = next((name for name in _ENCODINGS if name in accepted), None)
+        if encoding is None:
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        resolved = str(Path(full_path).resolve())
+        mtime, variants = self._compressed.get(resolved, (None, None))
+        if variants is None or mtime != stat_result.st_mtime:
+            # Brotli is slow enough to stall the event loop, so refresh in the background.
+            self._recompress(resolved, stat_result.st_mtime)
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        # Borrow the validators FileResponse derives from the stat result, made encoding-specific.
+        plain = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        headers = {
+            "etag": plain.headers["etag"][:-1] + f'-{encoding}"',
+            "last-modified": plain.headers["last-modified"],
+            "content-encoding": encoding,
+            "vary": "Accept-Encoding",
+        }
+        if self.is_not_modified(Headers(headers=headers), request_headers):
+            return NotModifiedResponse(Headers(headers=headers))
+        return Response(
+            variants[encoding], status_code=status_code, media_type=plain.media_type, headers=headers
+        )